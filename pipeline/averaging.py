@@ -1,3 +1,4 @@
+import re
 import warnings
 
 import numpy as np
@@ -167,6 +168,28 @@ def compute_evokeds_cols(
     return all_evokeds, all_evokeds_df
 
 
+def get_condition_cols(average_by, columns):
+    """Gets the names of the log file columns that define the conditions."""
+
+    # Columns that are referenced in any of the log file queries (ignoring
+    # quoted values, which might look like column names)
+    if isinstance(average_by, dict):
+        queries = ' '.join(average_by.values())
+        queries = re.sub(r'(["\'])(?:(?!\1).)*\1', '', queries)
+        return [col for col in columns
+                if re.search(rf'(?<!\w){re.escape(col)}(?!\w)', queries)]
+
+    # Or columns that are averaged over (including interactions)
+    if isinstance(average_by, str):
+        average_by = [average_by]
+    condition_cols = []
+    for cols in average_by or []:
+        condition_cols += [col for col in cols.split('/')
+                           if col in columns and col not in condition_cols]
+
+    return condition_cols
+
+
 def average_by_events(epochs, method='mean'):
     """Create a list of evokeds from epochs, one per event type."""
 
@@ -4,7 +4,7 @@ import numpy as np
 import pandas as pd
 from joblib import Parallel, delayed
 
-from .averaging import compute_grands, compute_grands_df
+from .averaging import compute_grands, compute_grands_df, get_condition_cols
 from .io import (convert_participant_input, files_from_dir, get_participant_id,
                  package_versions, save_config, save_df, save_evokeds)
 from .participant import participant_pipeline
@@ -29,6 +29,7 @@ def group_pipeline(
     ica_n_components=0.99,
     highpass_freq=0.1,
     lowpass_freq=40.0,
+    filter_method='fir',
     triggers=None,
     triggers_column=None,
     epochs_tmin=-0.5,
@@ -106,6 +107,7 @@ def group_pipeline(
         ica_n_components=ica_n_components,
         highpass_freq=highpass_freq,
         lowpass_freq=lowpass_freq,
+        filter_method=filter_method,
         triggers=triggers,
         triggers_column=triggers_column,
         epochs_tmin=epochs_tmin,
@@ -156,9 +158,9 @@ def group_pipeline(
     participant_args = zip(vhdr_files, log_files, besa_files,
                            bad_channels, skip_log_rows)
 
-    # Do processing in parallel
+    # Do processing in parallel, with one participant per job
     n_jobs = int(n_jobs)
-    res = Parallel(n_jobs)(
+    res = Parallel(n_jobs, batch_size=1)(
         delayed(partial_pipeline)(*args) for args in participant_args)
 
     # Sort outputs into seperate lists
@@ -171,13 +173,16 @@ def group_pipeline(
 
     # Combine evokeds_dfs and save
     evokeds_df = pd.concat(evokeds_dfs, ignore_index=True)
-    save_df(evokeds_df, output_dir, suffix='ave')
+    df_fmt = 'parquet' if to_df == 'parquet' else 'csv'
+    condition_cols = get_condition_cols(average_by, trials.columns)
+    save_df(evokeds_df, output_dir, suffix='ave', fmt=df_fmt,
+            condition_cols=condition_cols)
 
     # Compute grand averaged ERPs and save
     grands = compute_grands(evokeds)
     grands_df = compute_grands_df(evokeds_df)
-    save_evokeds(
-        grands, grands_df, output_dir, participant_id='grand', to_df=to_df)
+    save_evokeds(grands, grands_df, output_dir, participant_id='grand',
+                 to_df=to_df, condition_cols=condition_cols)
 
     # Update config with participant-specific inputs...
     config['vhdr_files'] = vhdr_files
@@ -233,15 +238,16 @@ def group_pipeline(
 
         # Combine evokeds_df for power and save
         tfr_evokeds_df = pd.concat(tfr_evokeds_dfs, ignore_index=True)
-        save_df(tfr_evokeds_df, output_dir,
-                suffix='tfr_ave')
+        save_df(tfr_evokeds_df, output_dir, suffix='tfr_ave', fmt=df_fmt,
+                condition_cols=condition_cols)
         returns.append(tfr_evokeds_df)
 
         # Compute grand averaged power and save
         tfr_grands = compute_grands(tfr_evokeds)
         tfr_grands_df = compute_grands_df(tfr_evokeds_df)
         save_evokeds(tfr_grands, tfr_grands_df, output_dir,
-                     participant_id='tfr_grand', to_df=to_df)
+                     participant_id='tfr_grand', to_df=to_df,
+                     condition_cols=condition_cols)
 
         # Cluster based permutation tests for TFR
         if perm_contrasts != []:
@@ -4,11 +4,13 @@ from glob import glob
 from os import makedirs, path
 from platform import python_version
 
+import numpy as np
 import pandas as pd
 from mne import Evoked
 from mne import __version__ as mne_version
-from mne import write_evokeds
+from mne import pick_types, write_evokeds
 from mne.channels.layout import _find_topomap_coords
+from mne.defaults import _handle_default
 from mne.io import concatenate_raws, read_raw_brainvision
 from mne.time_frequency import AverageTFR, write_tfrs
 from numpy import __version__ as numpy_version
@@ -17,16 +19,44 @@ from sklearn import __version__ as sk_version
 
 from ._version import version as pipeline_version
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    from pyarrow import parquet as pq
+except ImportError:
+    pa = None
+
+try:
+    import polars as pl
+    # Older versions lack `include_header` and a common base exception
+    if tuple(int(v) for v in pl.__version__.split('.')[:2]) < (0, 20):
+        pl = None
+except ImportError:
+    pl = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Errors raised if a DataFrame can't be converted for the pyarrow or polars
+# CSV writers, e.g., because of mixed types in a column
+CONVERSION_ERRORS = (ValueError, TypeError, NotImplementedError)
+if pl is not None:
+    CONVERSION_ERRORS += (pl.exceptions.PolarsError,)
+
 
 def read_raw(vhdr_file_or_files):
     """Reads one or more raw EEG datasets from the same participant."""
 
     # Read raw datasets and combine if a list was provided
+    # Data are only loaded after combining to avoid holding them twice
     if isinstance(vhdr_file_or_files, list):
         vhdr_files = vhdr_file_or_files
         print(f'\n=== Reading and combining raw data from {vhdr_files} ===')
-        raw_list = [read_raw_brainvision(f, preload=True) for f in vhdr_files]
+        raw_list = [read_raw_brainvision(f, preload=False) for f in vhdr_files]
         raw = concatenate_raws(raw_list)
+        raw.load_data()
         participant_id = get_participant_id(vhdr_files)
 
     # Read raw dataset if only a single one was provided
@@ -81,13 +111,13 @@ def convert_participant_input(input, participant_ids):
 
     # If it's a dict, convert to list
     if isinstance(input, dict):
-        participant_dict = {id: None for id in participant_ids}
-        for id, values in input.items():
-            assert id in participant_ids, \
-                f'Participant ID {id} is not in vhdr_files'
-            values = [values] if not isinstance(values, list) else values
-            participant_dict[id] = values
-        return list(participant_dict.values())
+        unknown_ids = set(input) - frozenset(participant_ids)
+        if unknown_ids:
+            raise ValueError(
+                f'Participant ID(s) {sorted(unknown_ids)} not in vhdr_files')
+        input = {id: values if isinstance(values, list) else [values]
+                 for id, values in input.items()}
+        return [input.get(id) for id in participant_ids]
 
     # If it's a list of list, it must have the same length as participant_ids
     elif is_nested_list(input):
@@ -119,12 +149,19 @@ def save_clean(raw, output_dir, participant_id=''):
 
     # Create output folder and save
     makedirs(output_dir, exist_ok=True)
+    # Single precision is plenty for EEG and larger buffers mean fewer writes
     fname = f'{output_dir}/{participant_id_}{suffix}.fif'
-    raw.save(fname, overwrite=True)
+    raw.save(fname, fmt='single', buffer_size_sec=10., overwrite=True)
+
 
+def save_df(df, output_dir, participant_id='', suffix='', fmt='csv',
+            fast_io=True, append=False, chunksize=100_000, condition_cols=[],
+            writer=None):
+    """Saves (or appends) pd.DataFrame in `.csv` or `.parquet` format.
 
-def save_df(df, output_dir, participant_id='', suffix=''):
-    """Saves pd.DataFrame in `.csv` format."""
+    Returns the name of the CSV writer that was used, which should be passed
+    as `writer` when appending to the same file so that it has one dialect.
+    """
 
     # Create output folder
     makedirs(output_dir, exist_ok=True)
@@ -133,14 +170,100 @@ def save_df(df, output_dir, participant_id='', suffix=''):
     participant_id_ = '' if participant_id == '' else f'{participant_id}_'
     suffix = '' if suffix == '' else suffix
 
-    # Save DataFrame
+    # Save DataFrame in Parquet format
     fname = f'{output_dir}/{participant_id_}{suffix}.csv'
-    df.to_csv(
-        fname, na_rep='NA', float_format='%.4f', index=False)
-
-
-def save_epochs(epochs, output_dir, participant_id='', to_df=True):
-    """Saves mne.Epochs with metadata in `.fif` and/or `.csv` format."""
+    if fmt == 'parquet':
+        assert not append, 'Appending is only supported for `.csv` files'
+        df = categorize_id_cols(df, condition_cols)
+        df.to_parquet(fname.replace('.csv', '.parquet'), engine='pyarrow',
+                      compression='zstd', index=False)
+        return
+
+    # Or save DataFrame in CSV format, rounding all floats in one vectorized
+    # pass instead of formatting them one-by-one with `float_format`
+    assert fmt == 'csv', '`fmt` must be either \'csv\' or \'parquet\''
+    # Single precision columns (e.g., TFR power) are rounded in double
+    # precision, otherwise pandas writes small values like `1e-04`
+    float32_cols = df.select_dtypes('float32').columns
+    df = df.astype({col: 'float64' for col in float32_cols}).round(4)
+
+    # Spell out booleans like pandas does, for all writers, including columns
+    # with missing values, which pandas reads from log files as `object`
+    for col in df.select_dtypes(['bool', 'boolean', 'object']).columns:
+        if pd.api.types.infer_dtype(df[col], skipna=True) == 'boolean':
+            df[col] = df[col].map({True: 'True', False: 'False'},
+                                  na_action='ignore')
+
+    # Use the fastest available writer unless a specific one was requested,
+    # preferring polars because its output is identical to that of pandas
+    if writer is None:
+        writers = [name for name, module in [('polars', pl), ('pyarrow', pa)]
+                   if fast_io and module is not None] + ['pandas']
+    else:
+        writers = [writer]
+    for writer in writers:
+        try:
+            if writer == 'pyarrow':
+                write_csv_pyarrow(df, fname, append)
+            elif writer == 'polars':
+                write_csv_polars(df, fname, append)
+            else:
+                mode = 'a' if append else 'w'
+                df.to_csv(fname, mode=mode, header=not append, na_rep='NA',
+                          index=False, chunksize=chunksize)
+            return writer
+        except CONVERSION_ERRORS:
+            if writer == writers[-1]:
+                raise
+            # E.g., mixed types in a column, fall back to the next writer
+
+
+def categorize_id_cols(df, condition_cols=[]):
+    """Converts participant and condition columns to categoricals."""
+
+    # Categoricals get dictionary-encoded in Parquet files
+    id_cols = ['participant_id', 'event_id', 'label', 'query', 'average_by']
+    id_cols = [col for col in dict.fromkeys(id_cols + list(condition_cols))
+               if col in df.columns]
+    id_cols = list(df[id_cols].select_dtypes(['object', 'string']).columns)
+    if id_cols != []:
+        df = df.copy(deep=False)  # Only the converted columns are new
+        df[id_cols] = df[id_cols].astype('category')
+
+    return df
+
+
+def write_csv_pyarrow(df, fname, append=False):
+    """Writes pd.DataFrame to `.csv` using pyarrow's multithreaded writer."""
+
+    # Convert to pyarrow table and write with `NA` as missing values
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    write_options = pa_csv.WriteOptions(
+        include_header=not append, delimiter=',', null_string='NA')
+    with open(fname, 'ab' if append else 'wb') as f:
+        pa_csv.write_csv(table, f, write_options=write_options)
+
+
+def write_csv_polars(df, fname, append=False):
+    """Writes pd.DataFrame to `.csv` using polars' multithreaded writer."""
+
+    # Convert column-by-column, which unlike `pl.from_pandas()` doesn't
+    # require pyarrow, turning all kinds of missing values into nulls
+    # Non-numpy dtypes (e.g., nullable integers) must go through Python
+    # objects, otherwise `to_numpy()` would turn them into floats
+    pl_df = pl.DataFrame([
+        pl.Series(col, df[col].to_numpy(), nan_to_null=True)
+        if isinstance(df[col].dtype, np.dtype) and df[col].dtype.kind in 'iuf'
+        else pl.Series(col, df[col].to_numpy(dtype=object, na_value=None)
+                       .tolist())
+        for col in df.columns])
+    with open(fname, 'ab' if append else 'wb') as f:
+        pl_df.write_csv(f, include_header=not append, null_value='NA')
+
+
+def save_epochs(epochs, output_dir, participant_id='', to_df=True,
+                chunksize=100, condition_cols=[]):
+    """Saves mne.Epochs with metadata in `.fif` and/or `.csv`/`.parquet`."""
 
     # Create output folder
     makedirs(output_dir, exist_ok=True)
@@ -149,23 +272,12 @@ def save_epochs(epochs, output_dir, participant_id='', to_df=True):
     participant_id_ = '' if participant_id == '' else f'{participant_id}_'
     suffix = 'epo'
 
-    # Convert to DataFrame
-    if to_df is True or to_df == 'both':
-        scalings = {'eeg': 1e6, 'misc': 1e6}
-        epochs_df = epochs.to_data_frame(scalings=scalings, time_format=None)
-        epochs_df = epochs_df.rename(columns={'condition': 'event_id'})
-
-        # Add metadata from log file
-        metadata_df = epochs.metadata.copy()
-        metadata_df = metadata_df.drop([col for col in metadata_df.columns
-                                        if col in epochs_df.columns], axis=1)
-        n_samples = len(epochs.times)
-        metadata_df = metadata_df.loc[metadata_df.index.repeat(n_samples)]
-        metadata_df = metadata_df.reset_index(drop=True)
-        epochs_df = pd.concat([metadata_df, epochs_df], axis=1)
-
-        # Save DataFrame
-        save_df(epochs_df, output_dir, participant_id, suffix)
+    # Convert to DataFrame and save, in chunks of epochs to limit memory usage
+    if to_df == 'parquet':
+        save_epochs_parquet(epochs, output_dir, participant_id, suffix,
+                            chunksize, condition_cols)
+    elif to_df is True or to_df == 'both':
+        save_epochs_csv(epochs, output_dir, participant_id, suffix, chunksize)
 
     # Save as MNE object
     if to_df is False or to_df == 'both':
@@ -173,9 +285,117 @@ def save_epochs(epochs, output_dir, participant_id='', to_df=True):
         epochs.save(fname, overwrite=True)
 
 
-def save_evokeds(
-        evokeds, evokeds_df, output_dir, participant_id='', to_df=True):
-    """Saves a list of mne.Evokeds in `.fif` and/or `.csv` format."""
+def save_epochs_parquet(epochs, output_dir, participant_id, suffix, chunksize,
+                        condition_cols=[]):
+    """Saves mne.Epochs with metadata in `.parquet` format, chunk by chunk."""
+
+    # Re-format participant ID for filename
+    assert pa is not None, 'Saving `.parquet` files requires `pyarrow`'
+    participant_id_ = '' if participant_id == '' else f'{participant_id}_'
+    fname = f'{output_dir}/{participant_id_}{suffix}.parquet'
+
+    # Write chunks as row groups of the same file
+    writer = None
+    try:
+        for start in range(0, len(epochs), chunksize):
+            epochs_df = epochs_to_df(epochs[start:start + chunksize])
+            epochs_df = categorize_id_cols(epochs_df, condition_cols)
+            if writer is None:
+                schema = parquet_schema(epochs_df, epochs.metadata)
+                writer = pq.ParquetWriter(fname, schema, compression='zstd')
+            table = pa.Table.from_pandas(
+                epochs_df, schema=schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def parquet_schema(df, metadata=None):
+    """Gets a pyarrow schema for writing all chunks of a `.parquet` file."""
+
+    # The schema is inferred from the first chunk, but columns that are empty
+    # in this chunk get their type from the metadata of all epochs
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    metadata_schema = pa.Schema.from_pandas(metadata, preserve_index=False) \
+        if metadata is not None else pa.schema([])
+    for ix, field in enumerate(schema):
+        if field.type == pa.null() and field.name in metadata_schema.names:
+            field_type = metadata_schema.field(field.name).type
+            schema = schema.set(ix, field.with_type(field_type))
+
+        # Later chunks may have more categories than fit into small indices
+        elif pa.types.is_dictionary(field.type):
+            field_type = pa.dictionary(pa.int32(), field.type.value_type)
+            schema = schema.set(ix, field.with_type(field_type))
+
+    return schema
+
+
+def save_epochs_csv(epochs, output_dir, participant_id, suffix, chunksize):
+    """Saves mne.Epochs with metadata in `.csv` format, chunk by chunk."""
+
+    # Use the same writer for all chunks so that the file is formatted
+    # consistently, starting over with pandas if a later chunk can't be
+    # written with the (fast) writer picked for the first chunk
+    for writer in [None, 'pandas']:
+        try:
+            write_epochs_csv(epochs, output_dir, participant_id, suffix,
+                             chunksize, writer)
+            return
+        except CONVERSION_ERRORS:
+            if writer == 'pandas':
+                raise
+
+
+def write_epochs_csv(
+        epochs, output_dir, participant_id, suffix, chunksize, writer=None):
+    """Writes all chunks of epochs to one `.csv` file with the same writer."""
+
+    for start in range(0, len(epochs), chunksize):
+        epochs_df = epochs_to_df(epochs[start:start + chunksize])
+        writer = save_df(epochs_df, output_dir, participant_id, suffix,
+                         append=start > 0, writer=writer)
+
+
+def epochs_to_df(epochs, scalings={'eeg': 1e6, 'misc': 1e6}):
+    """Converts mne.Epochs with metadata to a long-format pd.DataFrame."""
+
+    # Scale data (e.g., from V to µV) without going through `to_data_frame()`,
+    # starting from the same default scalings as MNE
+    scalings = _handle_default('scalings', scalings)
+    ch_scalings = [scalings.get(ch_type, 1.0)
+                   for ch_type in epochs.get_channel_types()]
+    data = epochs.get_data() * np.array(ch_scalings)[:, np.newaxis]
+
+    # Reshape to one row per sample and one column per channel
+    n_epochs, n_channels, n_samples = data.shape
+    data = data.transpose(0, 2, 1).reshape(-1, n_channels)
+
+    # Add columns for time, condition, and epoch number
+    rev_event_id = {value: key for key, value in epochs.event_id.items()}
+    event_ids = [rev_event_id[event] for event in epochs.events[:, 2]]
+    columns = {'time': np.tile(epochs.times, n_epochs),
+               'event_id': np.repeat(event_ids, n_samples),
+               'epoch': np.repeat(epochs.selection, n_samples)}
+    columns.update({ch_name: data[:, ix]
+                    for ix, ch_name in enumerate(epochs.ch_names)})
+
+    # Add metadata from log file, repeating each row once per sample
+    # Taking from the underlying arrays keeps nullable and categorical dtypes
+    if epochs.metadata is not None:
+        metadata = epochs.metadata
+        repeat_ixs = np.repeat(np.arange(len(metadata)), n_samples)
+        metadata_columns = {col: metadata[col].array.take(repeat_ixs)
+                            for col in metadata.columns if col not in columns}
+        columns = {**metadata_columns, **columns}
+
+    return pd.DataFrame(columns)
+
+
+def save_evokeds(evokeds, evokeds_df, output_dir, participant_id='',
+                 to_df=True, condition_cols=[]):
+    """Saves a list of mne.Evokeds in `.fif` and/or `.csv`/`.parquet`."""
 
     # Re-format participant ID for filename
     participant_id_ = '' if participant_id == '' else f'{participant_id}_'
@@ -185,8 +405,10 @@ def save_evokeds(
     makedirs(output_dir, exist_ok=True)
 
     # Save evokeds as DataFrame
-    if to_df is True or to_df == 'both':
-        save_df(evokeds_df, output_dir, participant_id, suffix)
+    if to_df is True or to_df in ['both', 'parquet']:
+        fmt = 'parquet' if to_df == 'parquet' else 'csv'
+        save_df(evokeds_df, output_dir, participant_id, suffix, fmt,
+                condition_cols=condition_cols)
 
     # Save evokeds as MNE object
     if to_df is False or to_df == 'both':
@@ -209,14 +431,13 @@ def save_montage(epochs, output_dir):
     makedirs(output_dir, exist_ok=True)
 
     # Get locations of EEG channels
-    chs = epochs.copy().pick_types(eeg=True).info['chs']
-    coords = [ch['loc'][0:3] for ch in chs]
-    coords_df = pd.DataFrame(
-        columns=['cart_x', 'cart_y', 'cart_z'], data=coords)
-
-    # Add channel names
+    chs = _eeg_chs(epochs.info)
     ch_names = [ch['ch_name'] for ch in chs]
-    coords_df.insert(loc=0, column='channel', value=ch_names)
+    coords = np.stack([ch['loc'][0:3] for ch in chs])
+    coords_df = pd.DataFrame({'channel': ch_names,
+                              'cart_x': coords[:, 0],
+                              'cart_y': coords[:, 1],
+                              'cart_z': coords[:, 2]})
 
     # Add 2D flattened coordinates
     # Multiplied to mm scale (with head radius =~ 95 mm as in R-eegUtils)
@@ -226,16 +447,37 @@ def save_montage(epochs, output_dir):
     save_df(coords_df, output_dir, suffix='channel_locations')
 
 
+def _eeg_chs(info):
+    """Gets channel infos of EEG channels without copying an MNE object."""
+
+    picks = pick_types(info, eeg=True)
+    return [info['chs'][ix] for ix in picks]
+
+
 def save_config(config, output_dir):
     """Saves dict of pipeline config options in `.json` format."""
 
     # Create output directory
     makedirs(output_dir, exist_ok=True)
 
-    # Save
+    # Save (using orjson if available, which natively handles numpy types)
     fname = f'{output_dir}/config.json'
-    with open(fname, 'w') as f:
-        json.dump(config, f, indent=4)
+    if orjson is not None:
+        options = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | \
+            orjson.OPT_NON_STR_KEYS
+        with open(fname, 'wb') as f:
+            f.write(orjson.dumps(config, default=json_default, option=options))
+    else:
+        with open(fname, 'w') as f:
+            json.dump(config, f, indent=4, default=json_default)
+
+
+def json_default(obj):
+    """Converts numpy arrays/scalars and other objects for saving as JSON."""
+
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    return str(obj)
 
 
 def save_report(report, output_dir, participant_id):
@@ -1,9 +1,11 @@
+from inspect import signature
+
 import numpy as np
 import pandas as pd
 from mne import Epochs, events_from_annotations
 from mne.time_frequency import tfr_morlet
 
-from .averaging import compute_evokeds
+from .averaging import compute_evokeds, get_condition_cols
 from .epoching import (compute_single_trials, get_bad_channels, get_bad_epochs,
                        match_log_to_epochs, read_log, triggers_to_event_id)
 from .io import (read_raw, save_clean, save_df, save_epochs, save_evokeds,
@@ -30,6 +32,7 @@ def participant_pipeline(
     ica_n_components=0.99,
     highpass_freq=0.1,
     lowpass_freq=40.0,
+    filter_method='fir',
     triggers=None,
     triggers_column=None,
     epochs_tmin=-0.5,
@@ -85,8 +88,15 @@ def participant_pipeline(
     [2] https://github.com/alexenge/hu-neuro-pipeline/blob/dev/README.md
     """
 
-    # Backup input arguments for re-use
-    config = locals()
+    # Backup input arguments for re-use (explicitly, because `locals()` may
+    # later pick up large objects like the raw data)
+    config = {key: value for key, value in locals().items()
+              if key in _CONFIG_KEYS}
+
+    # Check options before any of the time-consuming processing steps
+    filter_methods = ['fir', 'iir']
+    assert filter_method in filter_methods, \
+        f'`filter_method` must be one of {filter_methods}'
 
     # Read raw data
     raw, participant_id = read_raw(vhdr_file)
@@ -108,25 +118,19 @@ def participant_pipeline(
     # Apply custom or standard montage
     apply_montage(raw, montage)
 
-    # Handle any bad channels
-    raw, interpolated_channels = interpolate_bad_channels(
-        raw, bad_channels, auto_bad_channels)
-
-    # Re-reference to common average
-    _ = raw.set_eeg_reference('average')
-
-    # Do ocular correction with BESA and/or ICA
-    if besa_file is not None:
-        raw = correct_besa(raw, besa_file)
-    if ica_method is not None:
-        raw, ica = correct_ica(raw, ica_method, ica_n_components)
-    else:
-        ica = None
+    # Keep a copy in case bad channels need to be interpolated later on
+    detect_bad_channels = bad_channels == 'auto' and auto_bad_channels is None
+    if detect_bad_channels:
+        raw_uncleaned = raw.copy()
 
-    # Filtering
-    filt = raw.copy().filter(highpass_freq, lowpass_freq, n_jobs=1)
+    # Interpolation, re-referencing, ocular correction, and filtering
+    raw, filt, ica, interpolated_channels = clean_raw(
+        raw, bad_channels, auto_bad_channels, besa_file, ica_method,
+        ica_n_components, highpass_freq, lowpass_freq, filter_method,
+        copy=perform_tfr)
 
     # Determine events and the corresponding (selection of) triggers
+    # All events are kept so that epoch numbers refer to the original markers
     events, event_id = events_from_annotations(
         filt, regexp='Stimulus', verbose=False)
     if triggers is not None:
@@ -139,12 +143,18 @@ def participant_pipeline(
                     preload=True, on_missing='warn')
 
     # Automatically detect bad channels and interpolate if necessary
-    if bad_channels == 'auto' and auto_bad_channels is None:
+    if detect_bad_channels:
         auto_bad_channels = get_bad_channels(epochs)
         config['auto_bad_channels'] = auto_bad_channels
         if auto_bad_channels != []:
-            print('Restarting with interpolation of bad channels')
-            return participant_pipeline(**config)
+            print('Repeating cleaning with interpolation of bad channels')
+            raw, filt, ica, interpolated_channels = clean_raw(
+                raw_uncleaned, bad_channels, auto_bad_channels, besa_file,
+                ica_method, ica_n_components, highpass_freq, lowpass_freq,
+                filter_method, copy=perform_tfr)
+            epochs = Epochs(filt, events, event_id, epochs_tmin, epochs_tmax,
+                            baseline, preload=True, on_missing='warn')
+        del raw_uncleaned
 
     # Add bad ICA components to config
     if ica is not None:
@@ -156,6 +166,11 @@ def participant_pipeline(
     _ = epochs.crop(tmin=None, tmax=epochs_tmax, include_tmax=False)
     print(epochs.__str__().replace(u"\u2013", "-"))
 
+    # Reduce numerical precision to reduce the size of the epochs (without
+    # touching the continuous data, which are still needed at full precision)
+    _ = epochs.apply_function(lambda x: x, dtype=np.float32,
+                              channel_wise=False)
+
     # Read behavioral log file and match to the epochs
     log = read_log(log_file, skip_log_rows, skip_log_conditions)
     if triggers_column is not None:
@@ -189,13 +204,18 @@ def participant_pipeline(
     if chanlocs_dir is not None:
         save_montage(epochs, chanlocs_dir)
 
+    # Get log file columns that define the conditions, e.g., for `.parquet`
+    condition_cols = get_condition_cols(average_by, epochs.metadata.columns)
+
     # Save epochs as data frame and/or MNE object
     if epochs_dir is not None:
-        save_epochs(epochs, epochs_dir, participant_id, to_df)
+        save_epochs(epochs, epochs_dir, participant_id, to_df,
+                    condition_cols=condition_cols)
 
     # Save evokeds as data frame and/or MNE object
     if evokeds_dir is not None:
-        save_evokeds(evokeds, evokeds_df, evokeds_dir, participant_id, to_df)
+        save_evokeds(evokeds, evokeds_df, evokeds_dir, participant_id, to_df,
+                     condition_cols)
 
     # Create and save HTML report
     if report_dir is not None:
@@ -258,9 +278,48 @@ def participant_pipeline(
 
         # Save evoked power
         if tfr_dir is not None:
-            save_evokeds(
-                tfr_evokeds, tfr_evokeds_df, tfr_dir, participant_id, to_df)
+            save_evokeds(tfr_evokeds, tfr_evokeds_df, tfr_dir, participant_id,
+                         to_df, condition_cols)
 
         return trials, evokeds, evokeds_df, config, tfr_evokeds, tfr_evokeds_df
 
     return trials, evokeds, evokeds_df, config
+
+
+# Names of the input arguments to store in the config
+_CONFIG_KEYS = list(signature(participant_pipeline).parameters)
+
+
+def clean_raw(raw, bad_channels=None, auto_bad_channels=None, besa_file=None,
+              ica_method=None, ica_n_components=0.99, highpass_freq=0.1,
+              lowpass_freq=40.0, filter_method='fir', copy=True):
+    """Interpolates bad channels, re-references, corrects, and filters."""
+
+    # Handle any bad channels
+    raw, interpolated_channels = interpolate_bad_channels(
+        raw, bad_channels, auto_bad_channels)
+
+    # Re-reference to common average
+    _ = raw.set_eeg_reference('average')
+
+    # Do ocular correction with BESA and/or ICA
+    if besa_file is not None:
+        raw = correct_besa(raw, besa_file)
+    if ica_method is not None:
+        raw, ica = correct_ica(raw, ica_method, ica_n_components)
+    else:
+        ica = None
+
+    # Only filter a copy if the unfiltered data are still needed (for TFR),
+    # otherwise filter in place to save one pass over (and copy of) the data
+    # Re-referencing can't be merged into this step because it must happen
+    # before the ocular correction
+    filt = raw.copy() if copy else raw
+
+    # Filtering with a single FIR bandpass or a zero-phase Butterworth filter
+    iir_params = dict(order=4, ftype='butter', output='sos') \
+        if filter_method == 'iir' else None
+    filt.filter(highpass_freq, lowpass_freq, n_jobs=1, method=filter_method,
+                iir_params=iir_params)
+
+    return raw, filt, ica, interpolated_channels
@@ -3,13 +3,15 @@ import pandas as pd
 from mne.channels import find_ch_adjacency
 from mne.stats import combine_adjacency, permutation_cluster_1samp_test
 
+from .io import _eeg_chs
+
 
 def compute_perm(evokeds_per_participant, contrasts, tmin=0.0, tmax=1.0,
                  channels=None, n_jobs=1, n_permutations=5001, seed=1234):
     """Performs a cluster based permutation test for a given contrast"""
 
     # Extract one example evoked for reading data dimensions
-    example_evoked = evokeds_per_participant[0][0].copy()
+    example_evoked = evokeds_per_participant[0][0]
 
     # Get relevant time samples
     times = example_evoked.times
@@ -20,7 +22,7 @@ def compute_perm(evokeds_per_participant, contrasts, tmin=0.0, tmax=1.0,
 
     # Get relevant channels
     if channels is None:
-        channels = example_evoked.pick_types(eeg=True).ch_names
+        channels = [ch['ch_name'] for ch in _eeg_chs(example_evoked.info)]
     else:
         assert all([ch in example_evoked.ch_names for ch in channels]), \
             'All channels in `perm_channels` must be present in the data!'
@@ -121,7 +123,7 @@ def compute_perm_tfr(
     """Performs a cluster based permutation test on time-frequency data"""
 
     # Extract one example evoked for reading data dimensions
-    example_evoked = evokeds_per_participant[0][0].copy()
+    example_evoked = evokeds_per_participant[0][0]
 
     # Get relevant time samples
     times = example_evoked.times
@@ -139,7 +141,7 @@ def compute_perm_tfr(
 
     # Get relevant channels
     if channels is None:
-        channels = example_evoked.pick_types(eeg=True).ch_names
+        channels = [ch['ch_name'] for ch in _eeg_chs(example_evoked.info)]
     else:
         assert all([ch in example_evoked.ch_names for ch in channels]), \
             'All channels in `perm_channels` must be present in the data!'
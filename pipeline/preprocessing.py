@@ -5,6 +5,8 @@ from mne import set_bipolar_reference
 from mne.channels import make_standard_montage, read_custom_montage
 from mne.preprocessing import ICA
 
+from .io import _eeg_chs
+
 
 def add_heog_veog(raw, veog_channels='auto', heog_channels='auto'):
     """Adds virtual VEOG and HEOG using default or non-default EOG names."""
@@ -70,7 +72,7 @@ def apply_montage(raw, montage):
             raw.set_channel_types({ch_name: 'misc'})
 
     # Drop EEG channels that are not in the montage
-    raw_channels = set(raw.copy().pick_types(eeg=True).ch_names)
+    raw_channels = set(ch['ch_name'] for ch in _eeg_chs(raw.info))
     montage_channels = set(digmontage.ch_names)
     drop_channels = list(raw_channels - montage_channels)
     if drop_channels != []:
@@ -126,7 +128,7 @@ def correct_besa(raw, besa_file):
     besa_matrix = pd.read_csv(besa_file, delimiter='\t', index_col=0)
 
     # Get EEG channel labels that are present in the data
-    eeg_channels = raw.copy().pick_types(eeg=True).ch_names
+    eeg_channels = [ch['ch_name'] for ch in _eeg_chs(raw.info)]
 
     # Convert EEG channel labels to uppercase
     eeg_upper = pd.Series(eeg_channels).str.upper().values
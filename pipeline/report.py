@@ -17,8 +17,9 @@ def create_report(
     set_log_level('ERROR')
     report = Report(title=f'Report for {participant_id}', verbose=False)
 
-    # Add raw data info
-    report.add_raw(raw, title='Raw data', butterfly=False)
+    # Add raw data info (without PSD and butterfly plots, which would need to
+    # visit every sample of the recording)
+    report.add_raw(raw, title='Raw data', psd=False, butterfly=False)
 
     # Add raw time series plots
     n_figs = 10
@@ -33,8 +34,8 @@ def create_report(
         report.add_ica(ica, title='ICA', inst=raw)
 
     # Add cleaned data info
-    report.add_raw(
-        clean, title='Cleaned data', butterfly=False, tags=('clean',))
+    report.add_raw(clean, title='Cleaned data', psd=False, butterfly=False,
+                   tags=('clean',))
 
     # Add cleaned time series plots
     clean_figs = plot_time_series(clean, n_figs)
@@ -0,0 +1,24 @@
+from pipeline.averaging import get_condition_cols
+
+
+def test_get_condition_cols_queries():
+    """Columns referenced in queries, but not quoted values, are found."""
+
+    average_by = {'related': 'semantics == "related" and `word type` > 1',
+                  'unrelated': "semantics == 'unrelated'"}
+    columns = ['semantics', 'word type', 'related', 'unrelated', 'rt']
+
+    assert get_condition_cols(average_by, columns) == \
+        ['semantics', 'word type']
+
+
+def test_get_condition_cols_columns():
+    """Main effects and interactions are split into unique columns."""
+
+    average_by = ['semantics', 'semantics/context', 'missing']
+    columns = ['semantics', 'context', 'rt']
+
+    assert get_condition_cols(average_by, columns) == \
+        ['semantics', 'context']
+    assert get_condition_cols('context', columns) == ['context']
+    assert get_condition_cols(None, columns) == []
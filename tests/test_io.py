@@ -0,0 +1,91 @@
+import csv
+
+import mne
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.io import epochs_to_df, save_df, save_epochs
+
+
+def read_cells(fname):
+    """Reads a `.csv` file as strings, ignoring how cells were quoted."""
+
+    with open(fname, newline='') as f:
+        return list(csv.reader(f))
+
+
+@pytest.mark.parametrize('writer', ['polars', 'pyarrow', 'pandas'])
+def test_save_df_missing_values(tmp_path, writer):
+    """Missing values must be written like `to_csv(na_rep='NA')` does."""
+
+    if writer != 'pandas':
+        pytest.importorskip(writer)
+
+    df = pd.DataFrame({'float': [1.5, np.nan, 3.25],
+                       'int': pd.array([1, None, 3], dtype='Int64'),
+                       'str': ['a', np.nan, 'c'],
+                       'bool': [True, False, True],
+                       'nullable_bool': pd.array([True, None, False],
+                                                 dtype='boolean'),
+                       'object_bool': [True, np.nan, False]})
+    save_df(df, str(tmp_path), suffix='fast', writer=writer)
+    df.to_csv(tmp_path / 'pandas.csv', na_rep='NA', index=False)
+
+    assert read_cells(tmp_path / 'fast.csv') == \
+        read_cells(tmp_path / 'pandas.csv')
+
+
+def test_save_epochs_csv_one_writer(tmp_path):
+    """All chunks of epochs must be written with the same CSV writer."""
+
+    info = mne.create_info(['Cz', 'Pz'], sfreq=100.0, ch_types='eeg')
+    epochs = mne.EpochsArray(np.zeros((4, 2, 3)), info, verbose=False)
+    # The last chunk has mixed types that only pandas can write
+    epochs.metadata = pd.DataFrame({'cond': ['a', 'b', 'c', 1],
+                                    'rt': [0.5, np.nan, 0.7, 0.8]})
+    save_epochs(epochs, str(tmp_path), 'sub', chunksize=2)
+    epochs_to_df(epochs).round(4).to_csv(
+        tmp_path / 'pandas.csv', na_rep='NA', index=False)
+
+    with open(tmp_path / 'sub_epo.csv') as f, \
+            open(tmp_path / 'pandas.csv') as f_pandas:
+        assert f.read() == f_pandas.read()
+
+
+def test_save_epochs_parquet(tmp_path):
+    """Epochs saved as `.parquet` must have categorical condition columns."""
+
+    pytest.importorskip('pyarrow')
+
+    info = mne.create_info(['Cz', 'Pz'], sfreq=100.0, ch_types='eeg')
+    epochs = mne.EpochsArray(np.zeros((4, 2, 3)), info, verbose=False)
+    epochs.metadata = pd.DataFrame({'participant_id': 'sub',
+                                    'cond': ['a', 'b', 'a', 'b'],
+                                    'item': ['x', 'y', 'z', 'x'],
+                                    'rt': [0.5, np.nan, 0.7, 0.8],
+                                    'resp': [None, None, 'l', 'r']})
+    save_epochs(epochs, str(tmp_path), 'sub', to_df='parquet', chunksize=2,
+                condition_cols=['cond'])
+
+    epochs_df = pd.read_parquet(tmp_path / 'sub_epo.parquet')
+    assert list(epochs_df.columns) == list(epochs_to_df(epochs).columns)
+    assert len(epochs_df) == 4 * 3
+    categorical_cols = list(epochs_df.select_dtypes('category').columns)
+    assert categorical_cols == ['participant_id', 'cond', 'event_id']
+    assert epochs_df['rt'].dtype == np.float64
+    assert list(epochs_df['resp']) == [None] * 6 + ['l'] * 3 + ['r'] * 3
+
+
+@pytest.mark.parametrize('writer', ['polars', 'pyarrow', 'pandas'])
+def test_save_df_float32(tmp_path, writer):
+    """Single precision floats must be written in fixed-point notation."""
+
+    if writer != 'pandas':
+        pytest.importorskip(writer)
+
+    df = pd.DataFrame({'power': np.array([0.0001, -0.0003, 1.5], 'float32')})
+    save_df(df, str(tmp_path), suffix='power', writer=writer)
+
+    assert read_cells(tmp_path / 'power.csv') == \
+        [['power'], ['0.0001'], ['-0.0003'], ['1.5']]